@@ -11,16 +11,175 @@ This module provides human-like typing simulation with:
 
 import asyncio
 import random
-from typing import List, Optional
+import string
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from playwright.async_api import Page
 
+# Shifted number-row symbols
+SHIFT_DIGIT_MAP: Dict[str, str] = {
+    '!': 'Digit1', '@': 'Digit2', '#': 'Digit3', '$': 'Digit4',
+    '%': 'Digit5', '^': 'Digit6', '&': 'Digit7', '*': 'Digit8',
+    '(': 'Digit9', ')': 'Digit0',
+}
+
+# Other shifted symbols
+SHIFT_SYMBOL_MAP: Dict[str, str] = {
+    '_': 'Minus', '+': 'Equal', '{': 'BracketLeft', '}': 'BracketRight',
+    '|': 'Backslash', ':': 'Semicolon', '"': 'Quote', '<': 'Comma',
+    '>': 'Period', '?': 'Slash',
+}
+
+SHIFT_MAP: Dict[str, str] = {**SHIFT_DIGIT_MAP, **SHIFT_SYMBOL_MAP}
+
+# Unshifted special characters
+SPECIAL_MAP: Dict[str, str] = {
+    '-': 'Minus', '=': 'Equal', '[': 'BracketLeft', ']': 'BracketRight',
+    '\\': 'Backslash', ';': 'Semicolon', "'": 'Quote', ',': 'Comma',
+    '.': 'Period', '/': 'Slash', '`': 'Backquote', ' ': 'Space',
+}
+
+
+# Interned key codes, shared by the lower- and uppercase plan entries
+_KEY_FOR_LOWER: Dict[str, str] = {
+    c: sys.intern(f'Key{c.upper()}') for c in string.ascii_lowercase
+}
+_DIGIT_FOR: Dict[str, str] = {d: sys.intern(f'Digit{d}') for d in string.digits}
+
+
+def _build_char_plan() -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Map each supported character to its (key code, modifier) pair.
+    Characters missing from the plan are sent with keyboard.type().
+    """
+    plan: Dict[str, Tuple[str, Optional[str]]] = {}
+    for c, key in _KEY_FOR_LOWER.items():
+        plan[c] = (key, None)
+        plan[c.upper()] = (key, 'Shift')
+    for c, key in _DIGIT_FOR.items():
+        plan[c] = (key, None)
+    for c, key in SPECIAL_MAP.items():
+        plan[c] = (sys.intern(key), None)
+    for c, key in SHIFT_MAP.items():
+        plan[c] = (sys.intern(key), 'Shift')
+    return plan
+
+
+CHAR_PLAN: Dict[str, Tuple[str, Optional[str]]] = _build_char_plan()
+
+
+def _build_difficulty_table() -> List[float]:
+    """
+    Typing difficulty multiplier for each ASCII code point.
+    Rules are applied from lowest to highest priority.
+    """
+    table = [1.0] * 128
+    for c in "-=[]\\;',./":  # Unshifted symbols
+        table[ord(c)] = 1.1
+    for c in SHIFT_MAP:  # Shifted symbols
+        table[ord(c)] = 1.8
+    for c in string.digits:  # Number row
+        table[ord(c)] = 1.2
+    for c in string.ascii_uppercase:  # Requires Shift
+        table[ord(c)] = 1.3
+    for c in 'qzxjkv':  # Difficult keys
+        table[ord(c)] = table[ord(c.upper())] = 1.6
+    for c in 'etaoinshrdlu':  # Home row and common
+        table[ord(c)] = table[ord(c.upper())] = 0.7
+    return table
+
+
+_DIFFICULTY: List[float] = _build_difficulty_table()
+_DIFFICULTY_ARRAY = np.array(_DIFFICULTY)
+
+# Neighbouring keys on a QWERTY layout, used to simulate typing errors
+_KEYBOARD_LAYOUT: Dict[str, str] = {
+    'q': 'wa', 'w': 'qesr', 'e': 'wrdt', 'r': 'etfg', 't': 'rygf',
+    'y': 'tuhg', 'u': 'yihj', 'i': 'uojk', 'o': 'ipkl', 'p': 'ol',
+    'a': 'qsw', 's': 'awedz', 'd': 'serfx', 'f': 'drtgc', 'g': 'ftyhv',
+    'h': 'gyujb', 'j': 'huikn', 'k': 'jiolm', 'l': 'kop',
+    'z': 'sx', 'x': 'zdc', 'c': 'xfv', 'v': 'cgb', 'b': 'vhn',
+    'n': 'bhm', 'm': 'nj'
+}
+_ADJACENT_KEYS: Dict[str, Tuple[str, ...]] = {
+    k: tuple(v) for k, v in _KEYBOARD_LAYOUT.items()
+}
+_ADJACENT_FALLBACK: Tuple[str, ...] = tuple('qwerty')
+
+
+@dataclass
+class _TypingSchedule:
+    """
+    Per-character random decisions for a typed string, rolled upfront in one batch.
+    """
+
+    delays: List[int]
+    mistakes: List[bool]
+    micro_pauses: List[bool]
+
+    @classmethod
+    def roll(
+        cls, text: str, base_delay: int, rng: np.random.Generator
+    ) -> '_TypingSchedule':
+        n = len(text)
+
+        # Delay after each key in ms, based on character complexity
+        codes = np.fromiter(map(ord, text), dtype=np.int64, count=n)
+        multipliers = np.where(
+            codes < 128, _DIFFICULTY_ARRAY[np.minimum(codes, 127)], 1.0
+        )
+        delays = base_delay * multipliers * rng.uniform(0.7, 1.4, n)
+        delays = np.maximum(20, delays.astype(np.int64))
+        # Slight variation
+        delays += rng.integers(-15, 16, n)
+
+        return cls(
+            delays=delays.tolist(),
+            mistakes=(rng.random(n) < 0.03).tolist(),  # 3% chance
+            micro_pauses=(rng.random(n) < 0.08).tolist(),  # 8% chance
+        )
+
+    @classmethod
+    def steady(
+        cls,
+        text: str,
+        base_delay: int,
+        rng: np.random.Generator,
+        jitter: bool = True,
+    ) -> '_TypingSchedule':
+        """
+        Fixed base delay and no typing errors. With jitter, delays vary
+        slightly and micro-pauses are added; without it every delay is exact.
+        """
+        n = len(text)
+        if not jitter:
+            return cls(
+                delays=[base_delay] * n,
+                mistakes=[False] * n,
+                micro_pauses=[False] * n,
+            )
+
+        delays = base_delay + rng.integers(-15, 16, n)
+        return cls(
+            delays=delays.tolist(),
+            mistakes=[False] * n,
+            micro_pauses=(rng.random(n) < 0.08).tolist(),  # 8% chance
+        )
+
 
 class RealisticKeyboard:
     """Ultra-realistic keyboard input simulator with human-like behavior"""
 
+    __slots__ = ('page', '_shift_held', '_rng')
+
     def __init__(self, page: Page):
         self.page = page
+        self._shift_held = False
+        # Per-instance generator, independent of the shared module-level one
+        self._rng = random.Random()
 
     async def type_realistically(
         self,
@@ -40,119 +199,128 @@ class RealisticKeyboard:
             random_delay: Enable random variations in typing speed (default: True)
             human_mistakes: Simulate typing errors and corrections (default: True)
             thinking_pauses: Add random pauses as if thinking (default: True)
+
+        With random_delay, human_mistakes and thinking_pauses all disabled,
+        every key is followed by exactly typing_delay milliseconds.
         """
-        words = text.split(' ')
-
-        for word_idx, word in enumerate(words):
-            # Pause between words (thinking/reading)
-            if word_idx > 0:
-                if thinking_pauses:
-                    pause_type = random.choices(
-                        ['short', 'medium', 'long', 'thinking'],
-                        weights=[60, 25, 10, 5]
-                    )[0]
-
-                    if pause_type == 'short':
-                        await asyncio.sleep(random.uniform(0.05, 0.15))
-                    elif pause_type == 'medium':
-                        await asyncio.sleep(random.uniform(0.2, 0.5))
-                    elif pause_type == 'long':
-                        await asyncio.sleep(random.uniform(0.6, 1.2))
-                    else:  # thinking
-                        await asyncio.sleep(random.uniform(1.0, 2.5))
-                else:
-                    await asyncio.sleep(random.uniform(0.05, 0.15))
-
-                # Type space
-                await self.page.keyboard.press('Space')
-                await asyncio.sleep(random.uniform(0.05, 0.12))
-
-            # Type each character in word
-            await self._type_word_realistic(
-                word, typing_delay, random_delay, human_mistakes
-            )
+        realism = random_delay or human_mistakes or thinking_pauses
 
-        # Final touches
-        await asyncio.sleep(random.uniform(0.1, 0.3))
+        # Seeded from the instance generator so its randomness stays reproducible
+        rng = np.random.default_rng(self._rng.getrandbits(64))
+        if random_delay:
+            schedule = _TypingSchedule.roll(text, typing_delay, rng)
+        else:
+            # Typing errors need random_delay, so keys are pressed at a steady pace
+            schedule = _TypingSchedule.steady(
+                text, typing_delay, rng, jitter=realism
+            )
 
-    async def _type_word_realistic(
+        try:
+            for i, char in enumerate(text):
+                if char == ' ' and realism:
+                    await self._type_space(thinking_pauses)
+                    continue
+
+                await self._type_char_realistic(
+                    char, i, typing_delay, human_mistakes, schedule
+                )
+        finally:
+            # Never leave Shift stuck down, even on errors or cancellation
+            await self._release_shift()
+
+        if realism:
+            # Final touches
+            await asyncio.sleep(self._rng.uniform(0.1, 0.3))
+
+    async def _type_space(self, thinking_pauses: bool) -> None:
+        """Pause between words (thinking/reading) and type a space"""
+        await self._release_shift()
+        await self._word_pause(thinking_pauses)
+
+        await self.page.keyboard.press('Space')
+        await asyncio.sleep(self._rng.uniform(0.05, 0.12))
+
+    async def _word_pause(self, thinking_pauses: bool) -> None:
+        """Pause between words as if thinking or reading"""
+        if not thinking_pauses:
+            await asyncio.sleep(self._rng.uniform(0.05, 0.15))
+            return
+
+        # Pause type weights: short 60%, medium 25%, long 10%, thinking 5%
+        r = self._rng.random()
+        if r < 0.60:  # short
+            low, high = 0.05, 0.15
+        elif r < 0.85:  # medium
+            low, high = 0.2, 0.5
+        elif r < 0.95:  # long
+            low, high = 0.6, 1.2
+        else:  # thinking
+            low, high = 1.0, 2.5
+        await asyncio.sleep(self._rng.uniform(low, high))
+
+    async def _type_char_realistic(
         self,
-        word: str,
+        char: str,
+        i: int,
         base_delay: int,
-        random_delay: bool,
         human_mistakes: bool,
+        schedule: _TypingSchedule,
     ) -> None:
-        """Type word with realistic patterns including errors"""
-        for char_idx, char in enumerate(word):
-            # Simulate typing errors (3% chance)
-            if human_mistakes and random_delay and random.random() < 0.03:
-                # Type wrong character
-                wrong_char = self._get_adjacent_key(char)
-                await self._type_single_char(wrong_char, base_delay, random_delay)
+        """Type the i-th character of the text with realistic patterns including errors"""
+        # Simulate typing errors (3% chance)
+        if human_mistakes and schedule.mistakes[i]:
+            # Type wrong character
+            wrong_char = self._get_adjacent_key(char)
+            await self._type_single_char(wrong_char, base_delay)
 
-                # Realize mistake (reaction time)
-                await asyncio.sleep(random.uniform(0.1, 0.5))
+            # Realize mistake (reaction time)
+            await asyncio.sleep(self._rng.uniform(0.1, 0.5))
 
-                # Correct mistake
-                await self.page.keyboard.press('Backspace')
-                await asyncio.sleep(random.uniform(0.05, 0.2))
+            # Correct mistake
+            await self._release_shift()
+            await self.page.keyboard.press('Backspace')
+            await asyncio.sleep(self._rng.uniform(0.05, 0.2))
 
-            # Type correct character
-            await self._type_single_char(char, base_delay, random_delay)
+        # Micro-pauses within words (8% chance)
+        pause = self._rng.uniform(0.02, 0.08) if schedule.micro_pauses[i] else 0.0
 
-            # Micro-pauses within words (8% chance)
-            if random.random() < 0.08:
-                await asyncio.sleep(random.uniform(0.02, 0.08))
+        # Type correct character
+        await self._type_single_char(char, base_delay, schedule.delays[i], pause)
 
     async def _type_single_char(
-        self, char: str, base_delay: int, random_delay: bool
+        self,
+        char: str,
+        base_delay: int,
+        actual_delay: Optional[int] = None,
+        pause: float = 0.0,
     ) -> None:
-        """Type single character with realistic timing and key events"""
-        # Calculate delay based on character complexity
-        if random_delay:
+        """
+        Type single character with realistic timing and key events.
+        The post-key delay and any extra pause are waited out in a single sleep.
+        """
+        if actual_delay is None:
+            # Calculate delay based on character complexity
             multiplier = self._get_char_difficulty_multiplier(char)
-            delay = base_delay * multiplier * random.uniform(0.7, 1.4)
+            delay = base_delay * multiplier * self._rng.uniform(0.7, 1.4)
             delay = max(20, int(delay))
-        else:
-            delay = base_delay
+
+            # Slight variation
+            actual_delay = delay + self._rng.randint(-15, 15)
 
         # Type character using proper key events
         await self._press_character_key(char)
 
-        # Wait with slight variation
-        actual_delay = delay + random.randint(-15, 15)
-        await asyncio.sleep(actual_delay / 1000.0)
+        await asyncio.sleep(actual_delay / 1000.0 + pause)
 
     def _get_char_difficulty_multiplier(self, char: str) -> float:
         """Get typing difficulty multiplier for character"""
-        if char.lower() in 'etaoinshrdlu':  # Home row and common
-            return 0.7
-        elif char.lower() in 'qzxjkv':  # Difficult keys
-            return 1.6
-        elif char.isupper():  # Requires Shift
-            return 1.3
-        elif char.isdigit():  # Number row
-            return 1.2
-        elif char in '!@#$%^&*()_+{}|:"<>?':  # Shifted symbols
-            return 1.8
-        elif char in "-=[]\\;',./":  # Unshifted symbols
-            return 1.1
-        else:
-            return 1.0
+        code = ord(char)
+        return _DIFFICULTY[code] if code < 128 else 1.0
 
     def _get_adjacent_key(self, char: str) -> str:
         """Get adjacent key for typing errors"""
-        keyboard_layout = {
-            'q': 'wa', 'w': 'qesr', 'e': 'wrdt', 'r': 'etfg', 't': 'rygf',
-            'y': 'tuhg', 'u': 'yihj', 'i': 'uojk', 'o': 'ipkl', 'p': 'ol',
-            'a': 'qsw', 's': 'awedz', 'd': 'serfx', 'f': 'drtgc', 'g': 'ftyhv',
-            'h': 'gyujb', 'j': 'huikn', 'k': 'jiolm', 'l': 'kop',
-            'z': 'sx', 'x': 'zdc', 'c': 'xfv', 'v': 'cgb', 'b': 'vhn',
-            'n': 'bhm', 'm': 'nj'
-        }
-
-        adjacent = keyboard_layout.get(char.lower(), 'qwerty')
-        return random.choice(adjacent)
+        adjacent = _ADJACENT_KEYS.get(char.lower(), _ADJACENT_FALLBACK)
+        return adjacent[self._rng.randrange(len(adjacent))]
 
     async def _press_character_key(self, char: str) -> None:
         """
@@ -160,65 +328,42 @@ class RealisticKeyboard:
 
         This is the critical method that uses proper key codes instead of
         just sending the character, which makes the input undetectable.
-        """
-        if char.isupper():
-            # Uppercase letters: hold Shift + press Key
-            await self.page.keyboard.down('Shift')
-            await asyncio.sleep(random.uniform(0.02, 0.06))
-            await self.page.keyboard.press(f'Key{char.upper()}')
-            await asyncio.sleep(random.uniform(0.02, 0.06))
-            await self.page.keyboard.up('Shift')
 
-        elif char in '!@#$%^&*()':
-            # Shifted number symbols
-            shift_map = {
-                '!': 'Digit1', '@': 'Digit2', '#': 'Digit3', '$': 'Digit4',
-                '%': 'Digit5', '^': 'Digit6', '&': 'Digit7', '*': 'Digit8',
-                '(': 'Digit9', ')': 'Digit0'
-            }
+        Shift is pressed once per run of consecutive shifted characters and
+        may still be held on return; callers release it with _release_shift().
+        """
+        plan = CHAR_PLAN.get(char)
+        if plan is None:
+            # Fallback for characters without a dedicated key code
+            await self._release_shift()
+            await self.page.keyboard.type(char)
+            return
+
+        key, modifier = plan
+        await self._set_shift(modifier is not None)
+        await self.page.keyboard.press(key)
+
+    async def _set_shift(self, shifted: bool) -> None:
+        """Press or release Shift when entering or leaving a run of shifted characters"""
+        if shifted and not self._shift_held:
+            await self._hold_shift()
+        elif not shifted and self._shift_held:
+            await self._release_shift()
+
+    async def _hold_shift(self) -> None:
+        """Press and hold Shift for an upcoming run of shifted characters"""
+
+        async def shift_down() -> None:
             await self.page.keyboard.down('Shift')
-            await asyncio.sleep(random.uniform(0.02, 0.05))
-            await self.page.keyboard.press(shift_map[char])
-            await asyncio.sleep(random.uniform(0.02, 0.05))
-            await self.page.keyboard.up('Shift')
+            self._shift_held = True
 
-        elif char in '_+{}|:"<>?':
-            # Other shifted symbols
-            shift_map = {
-                '_': 'Minus', '+': 'Equal', '{': 'BracketLeft', '}': 'BracketRight',
-                '|': 'Backslash', ':': 'Semicolon', '"': 'Quote', '<': 'Comma',
-                '>': 'Period', '?': 'Slash'
-            }
-            if char in shift_map:
-                await self.page.keyboard.down('Shift')
-                await asyncio.sleep(random.uniform(0.02, 0.05))
-                await self.page.keyboard.press(shift_map[char])
-                await asyncio.sleep(random.uniform(0.02, 0.05))
-                await self.page.keyboard.up('Shift')
-            else:
-                # Fallback for unknown characters
-                await self.page.keyboard.type(char)
-
-        elif char.isalpha():
-            # Lowercase letters
-            await self.page.keyboard.press(f'Key{char.upper()}')
-
-        elif char.isdigit():
-            # Numbers
-            await self.page.keyboard.press(f'Digit{char}')
+        await asyncio.gather(shift_down(), asyncio.sleep(self._rng.uniform(0.02, 0.06)))
 
-        else:
-            # Other special characters
-            special_map = {
-                '-': 'Minus', '=': 'Equal', '[': 'BracketLeft', ']': 'BracketRight',
-                '\\': 'Backslash', ';': 'Semicolon', "'": 'Quote', ',': 'Comma',
-                '.': 'Period', '/': 'Slash', '`': 'Backquote', ' ': 'Space'
-            }
-            if char in special_map:
-                await self.page.keyboard.press(special_map[char])
-            else:
-                # Ultimate fallback
-                await self.page.keyboard.type(char)
+    async def _release_shift(self) -> None:
+        """Release Shift if it is still held from a previous character"""
+        if self._shift_held:
+            await self.page.keyboard.up('Shift')
+            self._shift_held = False
 
     async def clear_field(self, selector: Optional[str] = None) -> None:
         """
@@ -229,41 +374,42 @@ class RealisticKeyboard:
         """
         if selector:
             await self.page.click(selector)
-            await asyncio.sleep(random.uniform(0.1, 0.3))
+            await asyncio.sleep(self._rng.uniform(0.1, 0.3))
 
         # Choose a random clearing method
-        clear_method = random.choice(['ctrl_a', 'triple_click', 'select_all', 'end_shift_home'])
+        clear_method = self._rng.choice(['ctrl_a', 'triple_click', 'select_all', 'end_shift_home'])
 
         if clear_method == 'ctrl_a':
             await self._press_key_combo(['Control', 'KeyA'])
         elif clear_method == 'triple_click':
             for _ in range(3):
                 await self.page.mouse.click(0, 0)
-                await asyncio.sleep(random.uniform(0.05, 0.1))
+                await asyncio.sleep(self._rng.uniform(0.05, 0.1))
         elif clear_method == 'end_shift_home':
             await self.page.keyboard.press('End')
-            await asyncio.sleep(random.uniform(0.02, 0.05))
+            await asyncio.sleep(self._rng.uniform(0.02, 0.05))
             await self._press_key_combo(['Shift', 'Home'])
         else:
             await self._press_key_combo(['Shift', 'Control', 'End'])
 
-        await asyncio.sleep(random.uniform(0.1, 0.2))
+        await asyncio.sleep(self._rng.uniform(0.1, 0.2))
         await self.page.keyboard.press('Delete')
-        await asyncio.sleep(random.uniform(0.05, 0.15))
+        await asyncio.sleep(self._rng.uniform(0.05, 0.15))
 
     async def _press_key_combo(self, keys: List[str]) -> None:
-        """Press key combination with realistic timing"""
+        """
+        Press key combination with realistic timing.
+        Humans press the keys of a combo within a few ms of each other, so all
+        keys go down (and up) in one batch. gather() starts the calls in order,
+        which keeps the event order on the Playwright connection.
+        """
         # Press keys down
-        for key in keys:
-            await self.page.keyboard.down(key)
-            await asyncio.sleep(random.uniform(0.01, 0.03))
+        await asyncio.gather(*(self.page.keyboard.down(key) for key in keys))
 
-        await asyncio.sleep(random.uniform(0.02, 0.05))
+        await asyncio.sleep(self._rng.uniform(0.02, 0.05))
 
         # Release keys up (reverse order)
-        for key in reversed(keys):
-            await self.page.keyboard.up(key)
-            await asyncio.sleep(random.uniform(0.01, 0.03))
+        await asyncio.gather(*(self.page.keyboard.up(key) for key in reversed(keys)))
 
 
 async def type_realistic(
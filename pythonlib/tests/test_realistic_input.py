@@ -0,0 +1,263 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from camoufox.realistic_input import (
+    _ADJACENT_KEYS,
+    _DIFFICULTY,
+    RealisticKeyboard,
+    _TypingSchedule,
+    type_realistic,
+)
+
+
+class FakeKeyboard:
+    def __init__(
+        self, fail_on: Optional[str] = None, block_on: Optional[str] = None
+    ) -> None:
+        self.events: List[Tuple[str, str]] = []
+        self.fail_on = fail_on
+        self.block_on = block_on
+        self.blocked = asyncio.Event()
+
+    async def down(self, key: str) -> None:
+        self.events.append(("down", key))
+
+    async def up(self, key: str) -> None:
+        self.events.append(("up", key))
+
+    async def press(self, key: str) -> None:
+        if key == self.fail_on:
+            raise RuntimeError(f"press failed: {key}")
+        if key == self.block_on:
+            self.blocked.set()
+            await asyncio.Event().wait()
+        self.events.append(("press", key))
+
+    async def type(self, text: str, delay: Optional[float] = None) -> None:
+        self.events.append(("type", text))
+
+
+class FakePage:
+    def __init__(self, keyboard: FakeKeyboard) -> None:
+        self.keyboard = keyboard
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> None:
+    real_sleep = asyncio.sleep
+
+    async def fast_sleep(delay: float, *args) -> None:
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fast_sleep)
+
+
+def test_shift_held_once_per_run() -> None:
+    keyboard = FakeKeyboard()
+    asyncio.run(
+        type_realistic(FakePage(keyboard), "Hello WORLD!", human_mistakes=False)
+    )
+    assert keyboard.events == [
+        ("down", "Shift"),
+        ("press", "KeyH"),
+        ("up", "Shift"),
+        ("press", "KeyE"),
+        ("press", "KeyL"),
+        ("press", "KeyL"),
+        ("press", "KeyO"),
+        ("press", "Space"),
+        ("down", "Shift"),
+        ("press", "KeyW"),
+        ("press", "KeyO"),
+        ("press", "KeyR"),
+        ("press", "KeyL"),
+        ("press", "KeyD"),
+        ("press", "Digit1"),
+        ("up", "Shift"),
+    ]
+
+
+def test_shift_released_on_error() -> None:
+    keyboard = FakeKeyboard(fail_on="KeyR")
+    realistic = RealisticKeyboard(FakePage(keyboard))
+    with pytest.raises(RuntimeError):
+        asyncio.run(realistic.type_realistically("WORLD", human_mistakes=False))
+    assert keyboard.events[-1] == ("up", "Shift")
+    assert not realistic._shift_held
+
+
+def test_shift_released_on_cancel() -> None:
+    async def cancel_mid_run() -> Tuple[FakeKeyboard, RealisticKeyboard]:
+        # Created inside the loop so the keyboard's Event binds to it
+        keyboard = FakeKeyboard(block_on="KeyR")
+        realistic = RealisticKeyboard(FakePage(keyboard))
+        task = asyncio.create_task(
+            realistic.type_realistically("WORLD", human_mistakes=False)
+        )
+        await keyboard.blocked.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return keyboard, realistic
+
+    keyboard, realistic = asyncio.run(cancel_mid_run())
+    assert keyboard.events[-1] == ("up", "Shift")
+    assert not realistic._shift_held
+
+
+def test_steady_typing_uses_key_presses() -> None:
+    keyboard = FakeKeyboard()
+    asyncio.run(type_realistic(FakePage(keyboard), "Hi there", random_delay=False))
+    assert keyboard.events == [
+        ("down", "Shift"),
+        ("press", "KeyH"),
+        ("up", "Shift"),
+        ("press", "KeyI"),
+        ("press", "Space"),
+        ("press", "KeyT"),
+        ("press", "KeyH"),
+        ("press", "KeyE"),
+        ("press", "KeyR"),
+        ("press", "KeyE"),
+    ]
+
+
+
+def test_all_off_typing_is_fixed_pace(monkeypatch: pytest.MonkeyPatch) -> None:
+    real_sleep = asyncio.sleep
+    sleeps: List[float] = []
+
+    async def record_sleep(delay: float, *args) -> None:
+        sleeps.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", record_sleep)
+    keyboard = FakeKeyboard()
+    asyncio.run(
+        type_realistic(
+            FakePage(keyboard),
+            "Hi !",
+            typing_delay=50,
+            random_delay=False,
+            human_mistakes=False,
+            thinking_pauses=False,
+        )
+    )
+    assert keyboard.events == [
+        ("down", "Shift"),
+        ("press", "KeyH"),
+        ("up", "Shift"),
+        ("press", "KeyI"),
+        ("press", "Space"),
+        ("down", "Shift"),
+        ("press", "Digit1"),
+        ("up", "Shift"),
+    ]
+    # Every key is followed by exactly typing_delay; only Shift adds its own hold
+    assert sleeps.count(0.05) == 4
+    assert all(0.02 <= d <= 0.06 for d in sleeps if d != 0.05)
+
+def _ladder_multiplier(char: str) -> float:
+    # Difficulty rules as originally written, before the lookup table
+    if char.lower() in 'etaoinshrdlu':
+        return 0.7
+    elif char.lower() in 'qzxjkv':
+        return 1.6
+    elif char.isupper():
+        return 1.3
+    elif char.isdigit():
+        return 1.2
+    elif char in '!@#$%^&*()_+{}|:"<>?':
+        return 1.8
+    elif char in "-=[]\\;',./":
+        return 1.1
+    else:
+        return 1.0
+
+
+def test_difficulty_table_matches_ladder() -> None:
+    assert len(_DIFFICULTY) == 128
+    for code in range(1, 128):
+        assert _DIFFICULTY[code] == _ladder_multiplier(chr(code)), repr(chr(code))
+
+
+def test_schedule_bounds() -> None:
+    text = "Hello, World! 123 qzx" * 20
+    base_delay = 120
+    schedule = _TypingSchedule.roll(text, base_delay, np.random.default_rng())
+    assert len(schedule.delays) == len(text)
+    assert len(schedule.mistakes) == len(text)
+    assert len(schedule.micro_pauses) == len(text)
+    for char, delay in zip(text, schedule.delays):
+        high = int(base_delay * _ladder_multiplier(char) * 1.4)
+        assert 20 - 15 <= delay <= max(20, high) + 15
+
+
+def test_key_combo_order() -> None:
+    keyboard = FakeKeyboard()
+    realistic = RealisticKeyboard(FakePage(keyboard))
+    asyncio.run(realistic._press_key_combo(["Shift", "Control", "End"]))
+    assert keyboard.events == [
+        ("down", "Shift"),
+        ("down", "Control"),
+        ("down", "End"),
+        ("up", "End"),
+        ("up", "Control"),
+        ("up", "Shift"),
+    ]
+
+
+def test_typo_typed_without_shift(monkeypatch: pytest.MonkeyPatch) -> None:
+    def always_mistake(
+        text: str, base_delay: int, rng: np.random.Generator
+    ) -> _TypingSchedule:
+        n = len(text)
+        return _TypingSchedule(
+            delays=[base_delay] * n, mistakes=[True] * n, micro_pauses=[False] * n
+        )
+
+    monkeypatch.setattr(_TypingSchedule, "roll", staticmethod(always_mistake))
+    keyboard = FakeKeyboard()
+    asyncio.run(type_realistic(FakePage(keyboard), "A!"))
+
+    typo_a, typo_bang = keyboard.events[0], keyboard.events[5]
+    assert typo_a[0] == "press" and typo_a[1].startswith("Key")
+    assert typo_bang[0] == "press" and typo_bang[1].startswith("Key")
+    assert keyboard.events == [
+        typo_a,
+        ("press", "Backspace"),
+        ("down", "Shift"),
+        ("press", "KeyA"),
+        ("up", "Shift"),
+        typo_bang,
+        ("press", "Backspace"),
+        ("down", "Shift"),
+        ("press", "Digit1"),
+        ("up", "Shift"),
+    ]
+
+
+def test_seeded_instance_is_reproducible() -> None:
+    text = "The Quick brown fox, jumps over 13 lazy dogs!" * 5
+    runs = []
+    for _ in range(2):
+        keyboard = FakeKeyboard()
+        realistic = RealisticKeyboard(FakePage(keyboard))
+        realistic._rng.seed(1234)
+        asyncio.run(realistic.type_realistically(text))
+        runs.append(keyboard.events)
+    assert runs[0] == runs[1]
+    assert ("press", "Backspace") in runs[0]
+
+
+def test_adjacent_key_never_intended_key() -> None:
+    # No key lists itself, so a simulated typo never hits the intended key
+    assert all(k not in v for k, v in _ADJACENT_KEYS.items())
+
+    keyboard = RealisticKeyboard(FakePage(FakeKeyboard()))
+    for char in list(_ADJACENT_KEYS) + [c.upper() for c in _ADJACENT_KEYS]:
+        for _ in range(20):
+            assert keyboard._get_adjacent_key(char).lower() != char.lower()